@@ -0,0 +1,106 @@
+import numpy as np
+
+# Scaled features are quantized as round(x * QUANT_SCALE) into int8, i.e. a
+# resolution of 1/16 standard deviation over roughly +/-8 standard deviations.
+QUANT_SCALE = 16
+QUANT_MIN, QUANT_MAX = -127, 127
+# Thresholds below the input range clip to -128 so no saturated input passes q <= t
+THRESHOLD_MIN = -128
+# Leaf class probabilities are stored as uint8 in [0, PROBA_SCALE]
+PROBA_SCALE = 255
+
+def quantize_features(X):
+    """
+    Quantizes scaled (StandardScaler) feature rows to int8.
+    """
+    return np.clip(np.rint(np.asarray(X, dtype=np.float32) * QUANT_SCALE), QUANT_MIN, QUANT_MAX).astype(np.int8)
+
+def _smallest_int_dtype(max_value):
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+class QuantizedForest:
+    """
+    Compact, depth-limited tree ensemble for low-latency serving.
+
+    All trees are flattened into shared node arrays using the smallest integer
+    types that fit: int8 thresholds over int8-quantized inputs, small-int
+    feature and child indices, and uint8 leaf probabilities. Leaves point to
+    themselves, so inference is a fixed `max_depth` vectorised walk.
+
+    Exposes the `predict` / `predict_proba` / `classes_` subset of the
+    scikit-learn classifier API that ModelService relies on.
+    """
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+
+    @classmethod
+    def from_forest(cls, forest):
+        """
+        Builds a QuantizedForest from a fitted (depth-limited) sklearn forest
+        trained on StandardScaler-scaled features.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n_nodes)
+
+            # sklearn splits on x <= t; for grid-aligned x, q <= floor(t * scale) is the same test
+            threshold = np.floor(tree.threshold * QUANT_SCALE)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0, np.clip(threshold, THRESHOLD_MIN, QUANT_MAX)))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            proba = tree.value[:, 0, :]
+            proba = proba / np.maximum(proba.sum(axis=1, keepdims=True), 1e-12)
+            values.append(np.rint(proba * PROBA_SCALE))
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        index_dtype = _smallest_int_dtype(offset)
+        return cls(
+            feature=np.concatenate(features).astype(_smallest_int_dtype(forest.n_features_in_)),
+            threshold=np.concatenate(thresholds).astype(np.int8),
+            left=np.concatenate(lefts).astype(index_dtype),
+            right=np.concatenate(rights).astype(index_dtype),
+            value=np.concatenate(values).astype(np.uint8),
+            roots=np.asarray(roots, dtype=index_dtype),
+            max_depth=max_depth,
+            classes=np.asarray(forest.classes_),
+        )
+
+    def predict_proba(self, X):
+        X_q = quantize_features(X)
+        rows = np.arange(X_q.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X_q.shape[0], len(self.roots)))
+
+        for _ in range(self.max_depth):
+            go_left = X_q[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        totals = self.value[nodes].sum(axis=1, dtype=np.float32)
+        return totals / totals.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value, self.roots))
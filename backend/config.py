@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 import os
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -37,8 +37,21 @@ class Settings(BaseSettings):
     ALLOWED_EXTENSIONS: list[str] = [".wav", ".mp3", ".ogg", ".flac"]
     ALLOWED_MIME_TYPES: list[str] = ["audio/wav", "audio/mpeg", "audio/ogg", "audio/flac", "audio/x-wav"]
 
+    # Load Shedding / Admission Control
+    PREDICT_DEADLINE_SECONDS: float = 5.0  # Default per-request budget for /predict
+    DEGRADE_QUEUE_DEPTH: int = 4  # In-flight requests at which we switch to the fast profile
+    MAX_QUEUE_DEPTH: int = 16  # In-flight requests above which uncached requests are rejected
+    RESULT_CACHE_SIZE: int = 256  # Number of recent predictions kept for the cache tier
+
+    # Intermediate Feature Cache (decoded PCM, STFT, mel/MFCC, HPSS)
+    FEATURE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB in memory
+    FEATURE_CACHE_DTYPE: str = "float32"  # "float16" halves mel/MFCC memory; MFCC stats drift up to ~0.2% (PCM/HPSS stay float32)
+    FEATURE_CACHE_SPILL_DIR: Optional[str] = None  # Spill evicted arrays to memory-mapped .npy files
+    FEATURE_CACHE_MAX_SPILL_BYTES: int = 1024 * 1024 * 1024  # 1GB on disk, per worker process
+
     # Model Configuration
     MODEL_VERSION: str = "v1"  # e.g., "v1", "prod", "experimental"
+    MODEL_VARIANT: str = "full"  # "full" (forest) or "compact" (distilled, see train.py --distill)
     
     BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
     MODELS_DIR: str = os.path.join(BASE_DIR, "models")
@@ -49,6 +62,11 @@ class Settings(BaseSettings):
         filename = f"best_model_{self.MODEL_VERSION}.pkl" if self.MODEL_VERSION else "best_model.pkl"
         return os.path.join(self.MODELS_DIR, filename)
 
+    @property
+    def COMPACT_MODEL_PATH(self) -> str:
+        filename = f"compact_model_{self.MODEL_VERSION}.pkl" if self.MODEL_VERSION else "compact_model.pkl"
+        return os.path.join(self.MODELS_DIR, filename)
+
     @property
     def SCALER_PATH(self) -> str:
         filename = f"scaler_{self.MODEL_VERSION}.pkl" if self.MODEL_VERSION else "scaler.pkl"
@@ -0,0 +1,177 @@
+import os
+import shutil
+import atexit
+import tempfile
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class FeatureCache:
+    """
+    Bounded, content-addressed store of intermediate analysis arrays
+    (decoded PCM, STFT, mel/MFCC matrices, HPSS outputs, ...).
+
+    Entries are kept in memory up to `max_bytes` (LRU). Evicted entries are
+    spilled to .npy files under `spill_dir` (if set) and read back with
+    memory-mapping, bounded by `max_spill_bytes`. Each process spills into its
+    own `<pid>` subdirectory, removed on exit; subdirectories left by dead
+    processes are pruned on start-up. Real-valued arrays are stored
+    as `dtype` ("float32" or "float16"); complex arrays are always complex64
+    and scalars keep their precision.
+    """
+    def __init__(
+        self,
+        max_bytes: int,
+        spill_dir: Optional[str] = None,
+        max_spill_bytes: int = 0,
+        dtype: str = "float32",
+    ):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported feature cache dtype: {dtype}")
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.dtype = np.dtype(dtype)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._spilled: "OrderedDict[Hashable, Tuple[str, int]]" = OrderedDict()
+        self._spilled_bytes = 0
+
+        if self.spill_dir:
+            self._prune_stale_spill_dirs(self.spill_dir)
+            self.spill_dir = os.path.join(self.spill_dir, str(os.getpid()))
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            os.makedirs(self.spill_dir)
+            atexit.register(self.close)
+
+    @staticmethod
+    def _prune_stale_spill_dirs(root: str):
+        os.makedirs(root, exist_ok=True)
+        for name in os.listdir(root):
+            if not name.isdigit() or int(name) == os.getpid():
+                continue
+            try:
+                os.kill(int(name), 0)
+            except ProcessLookupError:
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            except OSError:
+                # Exists but owned by another user
+                pass
+
+    def close(self):
+        """
+        Drops all entries and removes this process's spill directory.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._spilled.clear()
+            self._spilled_bytes = 0
+            if self.spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def _compact(self, array: np.ndarray, compact: bool) -> np.ndarray:
+        array = np.asarray(array)
+        if array.ndim == 0 or not compact:
+            # Scalars (e.g. tempo) are negligible; keep them exact
+            return array
+        if np.iscomplexobj(array):
+            return array.astype(np.complex64, copy=False)
+        if np.issubdtype(array.dtype, np.floating):
+            return array.astype(self.dtype, copy=False)
+        return array
+
+    def _spill_path(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.npy")
+
+    def _spill(self, key: Hashable, array: np.ndarray):
+        # Called with the lock held
+        if not self.spill_dir or array.nbytes > self.max_spill_bytes:
+            return
+        path = self._spill_path(key)
+        # Write then rename: another thread may hold an mmap of the old file,
+        # and truncating it in place would fault that reader
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"FeatureCache: Failed to spill {key}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        if key in self._spilled:
+            self._spilled_bytes -= self._spilled.pop(key)[1]
+        self._spilled[key] = (path, array.nbytes)
+        self._spilled_bytes += array.nbytes
+
+        while self._spilled_bytes > self.max_spill_bytes:
+            _, (old_path, old_bytes) = self._spilled.popitem(last=False)
+            self._spilled_bytes -= old_bytes
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """
+        Returns the stored array (real arrays upcast to float32) or None.
+        """
+        with self._lock:
+            array = self._memory.get(key)
+            if array is not None:
+                self._memory.move_to_end(key)
+            elif key in self._spilled:
+                self._spilled.move_to_end(key)
+                path, _ = self._spilled[key]
+                try:
+                    array = np.load(path, mmap_mode="r")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"FeatureCache: Failed to load spilled {key}: {e}")
+                    return None
+
+        if array is not None and array.dtype == np.float16:
+            array = array.astype(np.float32)
+        return array
+
+    def put(self, key: Hashable, array: Any, compact: bool = True):
+        """
+        Stores `array` under `key`. Pass compact=False for source data (e.g.
+        decoded PCM) whose quantization error would propagate to every stage.
+        """
+        array = self._compact(array, compact)
+
+        with self._lock:
+            if array.nbytes > self.max_bytes:
+                self._spill(key, array)
+                return
+
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous.nbytes
+            self._memory[key] = array
+            self._memory_bytes += array.nbytes
+
+            while self._memory_bytes > self.max_bytes:
+                old_key, old_array = self._memory.popitem(last=False)
+                self._memory_bytes -= old_array.nbytes
+                self._spill(old_key, old_array)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "spilled_entries": len(self._spilled),
+                "spilled_bytes": self._spilled_bytes,
+            }
@@ -2,8 +2,75 @@ import librosa
 import numpy as np
 import warnings
 import io
+import hashlib
 
-def extract_features(audio_input, duration=3):
+# Feature profiles. "full" matches the training pipeline exactly; "fast" keeps
+# the same 58 keys but uses a short HPSS median kernel and onset-autocorrelation
+# tempo instead of full beat tracking, for use when the server is overloaded.
+PROFILE_FULL = "full"
+PROFILE_FAST = "fast"
+PROFILES = (PROFILE_FULL, PROFILE_FAST)
+
+FAST_HPSS_KERNEL = 7
+
+TARGET_SR = 22050
+
+def content_hash(audio_input):
+    """
+    SHA-256 of the raw upload bytes (file-like object or path), used as the
+    feature cache key.
+    """
+    if hasattr(audio_input, "getvalue"):
+        data = audio_input.getvalue()
+    else:
+        with open(audio_input, "rb") as f:
+            data = f.read()
+    return hashlib.sha256(data).hexdigest()
+
+def _cached(cache, key, compute, compact=True):
+    """
+    Returns cache[key], computing and storing it on a miss. With no cache,
+    simply computes. compact=False keeps full precision (see FeatureCache.put).
+    """
+    if cache is None:
+        return compute()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.put(key, value, compact=compact)
+    return value
+
+def _load_pcm(audio_input, duration, cache, digest):
+    """
+    Decodes audio at TARGET_SR. With a cache, the mono PCM is kept at its
+    native rate and each duration is sliced there and then resampled, exactly
+    as librosa.load(duration=...) does, so a cached longer decode gives the
+    same samples as a fresh one.
+    """
+    if cache is None:
+        # If input is BytesIO, we might need to reset pointer if reused, 
+        # but here it's consumed once.
+        y, _ = librosa.load(audio_input, duration=duration, sr=TARGET_SR)
+        return y
+
+    y_native, sr_native = None, cache.get(("pcm_sr", digest))
+    if sr_native is not None:
+        needed = int(duration * int(sr_native))
+        for kind in ("complete", "prefix"):
+            y = cache.get(("pcm", digest, kind))
+            if y is not None and (kind == "complete" or len(y) >= needed):
+                y_native = np.asarray(y[:needed], dtype=np.float32)
+                break
+
+    if y_native is None:
+        y_native, sr_native = librosa.load(audio_input, duration=duration, sr=None)
+        needed = int(duration * sr_native)
+        cache.put(("pcm_sr", digest), np.int64(sr_native))
+        cache.put(("pcm", digest, "complete" if len(y_native) < needed else "prefix"), y_native, compact=False)
+
+    return librosa.resample(y_native, orig_sr=int(sr_native), target_sr=TARGET_SR)
+
+def extract_features(audio_input, duration=3, profile=PROFILE_FULL, cache=None, digest=None):
     """
     Extracts 58 features from an audio file (path or file-like object).
     Matches the structure of the training data.
@@ -11,32 +78,50 @@ def extract_features(audio_input, duration=3):
     Args:
         audio_input (str or file-like): Path to audio file or file-like object (BytesIO).
         duration (int): Duration in seconds to analyze.
+        profile (str): "full" (training-equivalent) or "fast" (cheaper approximation
+            of the harmonic/percussive and tempo features).
+        cache (FeatureCache, optional): Store for intermediate arrays. Re-analysing
+            the same content only recomputes stages downstream of what changed.
+        digest (str, optional): Precomputed content_hash(audio_input).
         
     Returns:
         dict: Dictionary of extracted features, or None if extraction fails.
     """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown feature profile: {profile}")
+
     try:
+        if cache is not None and digest is None:
+            digest = content_hash(audio_input)
+
         # Load audio
         # librosa.load accepts file paths or file-like objects
-        target_sr = 22050
-        
-        # If input is BytesIO, we might need to reset pointer if reused, 
-        # but here it's consumed once.
-        y, sr = librosa.load(audio_input, duration=duration, sr=target_sr)
+        sr = TARGET_SR
+        y = _load_pcm(audio_input, duration, cache, digest)
         
         # Ensure consistent length (pad if too short)
-        target_length = int(duration * target_sr)
+        target_length = int(duration * sr)
         if len(y) < target_length:
             y = np.pad(y, (0, target_length - len(y)), 'constant')
         elif len(y) > target_length:
             y = y[:target_length]
+
+        # Shared intermediates: one complex STFT feeds the spectral features,
+        # the mel/MFCC chain and HPSS (same defaults librosa uses internally).
+        stft = _cached(cache, ("stft", digest, duration), lambda: librosa.stft(y))
+        mag = np.abs(stft)
+        power = mag ** 2
+        mel_db = _cached(
+            cache, ("mel_db", digest, duration),
+            lambda: librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr))
+        )
         
         # Features to extract
         # 1. length (number of samples)
         length = len(y)
         
         # 2. Chroma STFT
-        chroma_stft = librosa.feature.chroma_stft(y=y, sr=sr)
+        chroma_stft = librosa.feature.chroma_stft(S=power, sr=sr)
         chroma_stft_mean = np.mean(chroma_stft)
         chroma_stft_var = np.var(chroma_stft)
         
@@ -46,17 +131,17 @@ def extract_features(audio_input, duration=3):
         rms_var = np.var(rms)
         
         # 4. Spectral Centroid
-        spec_cent = librosa.feature.spectral_centroid(y=y, sr=sr)
+        spec_cent = librosa.feature.spectral_centroid(S=mag, sr=sr)
         spec_cent_mean = np.mean(spec_cent)
         spec_cent_var = np.var(spec_cent)
         
         # 5. Spectral Bandwidth
-        spec_bw = librosa.feature.spectral_bandwidth(y=y, sr=sr)
+        spec_bw = librosa.feature.spectral_bandwidth(S=mag, sr=sr)
         spec_bw_mean = np.mean(spec_bw)
         spec_bw_var = np.var(spec_bw)
         
         # 6. Rolloff
-        rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)
+        rolloff = librosa.feature.spectral_rolloff(S=mag, sr=sr)
         rolloff_mean = np.mean(rolloff)
         rolloff_var = np.var(rolloff)
         
@@ -66,19 +151,43 @@ def extract_features(audio_input, duration=3):
         zcr_var = np.var(zcr)
         
         # 8. Harmony and Perceptrual
-        y_harm, y_perc = librosa.effects.hpss(y)
+        kernel_size = FAST_HPSS_KERNEL if profile == PROFILE_FAST else 31
+
+        def compute_hpss():
+            stft_harm, stft_perc = librosa.decompose.hpss(stft, kernel_size=kernel_size)
+            return np.stack([
+                librosa.istft(stft_harm, dtype=y.dtype, length=len(y)),
+                librosa.istft(stft_perc, dtype=y.dtype, length=len(y)),
+            ])
+
+        # Kept at full precision: harmony/perceptr means are near zero, so
+        # float16 rounding of these signals shifts them by several percent
+        y_harm, y_perc = _cached(cache, ("hpss", digest, duration, kernel_size), compute_hpss, compact=False)
         harmony_mean = np.mean(y_harm)
         harmony_var = np.var(y_harm)
         perceptr_mean = np.mean(y_perc)
         perceptr_var = np.var(y_perc)
         
         # 9. Tempo
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        if isinstance(tempo, np.ndarray):
-             tempo = tempo[0]
+        def compute_tempo():
+            # Same onset envelopes the y-based calls build internally:
+            # feature.tempo aggregates mel bands by mean, beat_track by median
+            if profile == PROFILE_FAST:
+                onset_env = librosa.onset.onset_strength(S=mel_db, sr=sr)
+                tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=sr)
+            else:
+                onset_env = librosa.onset.onset_strength(S=mel_db, sr=sr, aggregate=np.median)
+                tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr)
+            # Cache as an exact scalar rather than a compacted 1-element array
+            return np.asarray(tempo).reshape(-1)[0]
+
+        tempo = np.asarray(_cached(cache, ("tempo", digest, duration, profile), compute_tempo))[()]
         
         # 10. MFCCs (20)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=20)
+        mfccs = _cached(
+            cache, ("mfcc", digest, duration),
+            lambda: librosa.feature.mfcc(S=mel_db, sr=sr, n_mfcc=20)
+        )
         
         features = {
             "length": length,
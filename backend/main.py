@@ -1,11 +1,11 @@
 import logging
 import io
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Depends
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, Optional
 from config import settings
-from services import ModelService, get_model_service
+from services import ModelService, ServiceOverloadedError, get_model_service
 
 # Configure Logging
 logging.basicConfig(
@@ -60,10 +60,12 @@ def health_check(service: ModelService = Depends(get_model_service)):
 @app.post("/predict")
 def predict(
     file: UploadFile = File(...),
+    x_deadline_ms: Optional[int] = Header(None),
     service: ModelService = Depends(get_model_service)
 ):
     """
     Predicts genre from uploaded audio file.
+    Clients may tighten (never extend) the server deadline via the X-Deadline-Ms header.
     """
     # FIX 7: Input Validation
     # 1. Check File Extension
@@ -88,15 +90,26 @@ def predict(
     
     logger.info(f"Processing prediction for: {file.filename} ({file.content_type})")
 
+    deadline = settings.PREDICT_DEADLINE_SECONDS
+    if x_deadline_ms is not None and x_deadline_ms > 0:
+        deadline = min(deadline, x_deadline_ms / 1000)
+
     try:
         # Read file in-memory
         content = file.file.read()
         audio_stream = io.BytesIO(content)
         
         # Delegate to service
-        result = service.predict(audio_stream, file.filename)
+        result = service.predict(audio_stream, file.filename, deadline=deadline)
         return result
         
+    except ServiceOverloadedError as e:
+        logger.warning(f"Shedding prediction for {file.filename}: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is overloaded. Please retry shortly.",
+            headers={"Retry-After": "1"}
+        )
     except ValueError as e:
         logger.error(f"Validation error during prediction: {e}")
         raise HTTPException(status_code=400, detail=str(e))
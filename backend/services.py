@@ -3,12 +3,30 @@ import joblib
 import logging
 import numpy as np
 import io
+import time
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from config import settings
-from feature_extractor import extract_features
+from feature_extractor import extract_features, content_hash, PROFILE_FULL, PROFILE_FAST
+from feature_cache import FeatureCache
 
 logger = logging.getLogger(__name__)
 
+TIER_CACHE = "cache"
+
+# Weight of the newest sample in the per-profile latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+# Latency estimates older than this (seconds) are ignored, so a past burst
+# cannot pin the service to a degraded tier once load drops
+LATENCY_ESTIMATE_TTL = 30.0
+
+class ServiceOverloadedError(RuntimeError):
+    """
+    Raised when a request cannot be served within its deadline or the
+    in-flight queue is full. Callers should retry later.
+    """
+
 class ModelService:
     """
     Service class to handle model loading and inference logic.
@@ -19,12 +37,38 @@ class ModelService:
         self.scaler = None
         self.label_encoder = None
         self.feature_columns = None
+
+        # Admission control state (shared across worker threads)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._latency_ewma: Dict[str, Optional[float]] = {PROFILE_FULL: None, PROFILE_FAST: None}
+        self._latency_updated: Dict[str, float] = {PROFILE_FULL: 0.0, PROFILE_FAST: 0.0}
+        # The first run of each profile includes librosa/numba JIT warm-up
+        # (seconds, vs. a fraction of a second warm) and is not representative
+        self._cold_profiles = {PROFILE_FULL, PROFILE_FAST}
+
+        # Intermediate arrays shared across re-analyses of the same upload
+        self.feature_cache = FeatureCache(
+            max_bytes=settings.FEATURE_CACHE_MAX_BYTES,
+            spill_dir=settings.FEATURE_CACHE_SPILL_DIR,
+            max_spill_bytes=settings.FEATURE_CACHE_MAX_SPILL_BYTES,
+            dtype=settings.FEATURE_CACHE_DTYPE,
+        )
+
         self.load_artifacts()
 
     def load_artifacts(self):
         try:
-            if os.path.exists(settings.MODEL_PATH):
-                self.model = joblib.load(settings.MODEL_PATH)
+            model_path = settings.MODEL_PATH
+            if settings.MODEL_VARIANT == "compact":
+                if os.path.exists(settings.COMPACT_MODEL_PATH):
+                    model_path = settings.COMPACT_MODEL_PATH
+                else:
+                    logger.warning("ModelService: Compact model not found, falling back to full model.")
+
+            if os.path.exists(model_path):
+                self.model = joblib.load(model_path)
             
             if os.path.exists(settings.SCALER_PATH):
                 self.scaler = joblib.load(settings.SCALER_PATH)
@@ -46,6 +90,63 @@ class ModelService:
     def is_ready(self) -> bool:
         return all([self.model, self.scaler, self.label_encoder, self.feature_columns])
 
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._result_cache.get(key)
+            if result is not None:
+                self._result_cache.move_to_end(key)
+            return result
+
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        if settings.RESULT_CACHE_SIZE <= 0:
+            return
+        with self._lock:
+            self._result_cache[key] = result
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > settings.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
+    def _record_latency(self, profile: str, elapsed: float):
+        with self._lock:
+            if profile in self._cold_profiles:
+                self._cold_profiles.discard(profile)
+                return
+            previous = self._latency_estimate(profile)
+            self._latency_updated[profile] = time.monotonic()
+            if previous is None:
+                self._latency_ewma[profile] = elapsed
+            else:
+                self._latency_ewma[profile] = LATENCY_EWMA_ALPHA * elapsed + (1 - LATENCY_EWMA_ALPHA) * previous
+
+    def _latency_estimate(self, profile: str) -> Optional[float]:
+        # Called with the lock held
+        if time.monotonic() - self._latency_updated[profile] > LATENCY_ESTIMATE_TTL:
+            return None
+        return self._latency_ewma[profile]
+
+    def _select_profile(self, depth: int, budget: float) -> str:
+        """
+        Picks the cheapest-acceptable feature profile for the current load.
+        Raises ServiceOverloadedError if even the fast profile is expected to
+        miss the deadline, unless the queue is idle: then the request is let
+        through on the fast profile to re-measure.
+        """
+        with self._lock:
+            full_estimate = self._latency_estimate(PROFILE_FULL)
+            fast_estimate = self._latency_estimate(PROFILE_FAST)
+
+        if depth < settings.DEGRADE_QUEUE_DEPTH and (full_estimate is None or full_estimate <= budget):
+            return PROFILE_FULL
+        if depth > 0 and fast_estimate is not None and fast_estimate > budget:
+            raise ServiceOverloadedError(
+                f"Estimated analysis time {fast_estimate:.2f}s exceeds deadline {budget:.2f}s"
+            )
+        return PROFILE_FAST
+
     def _run_inference(self, features: Dict[str, float]) -> Dict[str, Any]:
         """
         Internal method to run inference on extracted feature dictionary.
@@ -66,9 +167,12 @@ class ModelService:
         
         if hasattr(self.model, "predict_proba"):
             probs = self.model.predict_proba(scaled_data)[0]
-            classes = self.label_encoder.classes_
-            for i, prob in enumerate(probs):
-                all_probabilities[str(classes[i])] = float(prob)
+            # Columns follow model.classes_, which may be a subset of the encoder's
+            # labels (e.g. a distilled student that never saw some genre)
+            all_probabilities = {str(label): 0.0 for label in self.label_encoder.classes_}
+            labels = self.label_encoder.inverse_transform(self.model.classes_)
+            for label, prob in zip(labels, probs):
+                all_probabilities[str(label)] = float(prob)
             confidence = all_probabilities.get(prediction_label, 0.0)
         else:
             confidence = 1.0
@@ -80,16 +184,67 @@ class ModelService:
             "all_probabilities": all_probabilities
         }
 
-    def predict(self, audio_data: io.BytesIO, filename: str) -> Dict[str, Any]:
+    def predict(self, audio_data: io.BytesIO, filename: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Predicts the genre of an uploaded clip under load-aware admission control.
+
+        `deadline` is the time budget in seconds from the call (defaults to
+        PREDICT_DEADLINE_SECONDS). The result carries a "tier" key: "cache" for a
+        repeated upload, "full" for the training-equivalent pipeline, or "fast"
+        when the queue is deep or the full pipeline is expected to miss the
+        deadline. Analysis cannot be interrupted, so a request that still overruns
+        raises ServiceOverloadedError once it finishes; a full result is cached
+        first, so the client's retry is served from the cache tier.
+        """
         if not self.is_ready():
             raise RuntimeError("ModelService is not fully initialized.")
 
-        # Extract features
-        features = extract_features(audio_data, duration=settings.DURATION)
-        if features is None:
-            raise ValueError(f"Could not extract features from {filename}")
+        received = time.monotonic()
+        budget = settings.PREDICT_DEADLINE_SECONDS if deadline is None else deadline
+        digest = content_hash(audio_data)
+        cache_key = f"{settings.MODEL_VERSION}:{settings.DURATION}:{digest}"
 
-        return self._run_inference(features)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return {**cached, "tier": TIER_CACHE}
+
+        with self._lock:
+            depth = self._in_flight
+            if depth >= settings.MAX_QUEUE_DEPTH:
+                raise ServiceOverloadedError(f"Too many requests in flight ({depth})")
+            self._in_flight += 1
+
+        try:
+            profile = self._select_profile(depth, budget - (time.monotonic() - received))
+            if profile != PROFILE_FULL:
+                logger.info(f"Degrading {filename} to '{profile}' profile (queue depth {depth})")
+
+            # Extract features
+            start = time.monotonic()
+            features = extract_features(
+                audio_data,
+                duration=settings.DURATION,
+                profile=profile,
+                cache=self.feature_cache,
+                digest=digest
+            )
+            self._record_latency(profile, time.monotonic() - start)
+            if features is None:
+                raise ValueError(f"Could not extract features from {filename}")
+
+            result = self._run_inference(features)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        # Only training-equivalent results are worth serving again from cache
+        if profile == PROFILE_FULL:
+            self._cache_put(cache_key, result)
+
+        elapsed = time.monotonic() - received
+        if elapsed > budget:
+            raise ServiceOverloadedError(f"Deadline of {budget:.2f}s exceeded ({elapsed:.2f}s)")
+        return {**result, "tier": profile}
 
     def predict_from_features(self, features: Dict[str, float]) -> Dict[str, Any]:
         if not self.is_ready():
@@ -27,3 +27,20 @@ def mock_feature_columns():
         "zero_crossing_rate_mean", "zero_crossing_rate_var", "harmony_mean",
         "harmony_var", "perceptr_mean", "perceptr_var", "tempo"
     ] + [f"mfcc{i+1}_mean" for i in range(20)] + [f"mfcc{i+1}_var" for i in range(20)]
+
+@pytest.fixture
+def mock_audio_file_44k():
+    """
+    Generates a 6-second noisy tone at 44.1 kHz in-memory (BytesIO), so
+    loading at 22050 Hz has to resample.
+    """
+    sr = 44100
+    duration = 6
+    t = np.arange(int(sr * duration)) / sr
+    rng = np.random.default_rng(0)
+    y = 0.4 * np.sin(2 * np.pi * 330 * t) + 0.1 * rng.standard_normal(len(t))
+
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format='WAV')
+    buffer.seek(0)
+    return buffer
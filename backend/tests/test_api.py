@@ -9,7 +9,8 @@ import io
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from main import app
-from services import get_model_service, ModelService
+from config import settings
+from services import get_model_service, ModelService, ServiceOverloadedError
 
 client = TestClient(app)
 
@@ -90,4 +91,29 @@ def test_predict_features_endpoint():
     
     assert response.status_code == 200
     assert response.json()["predicted_genre"] == "jazz"
-    mock_service.predict_from_features.assert_called_once()
\ No newline at end of file
+    mock_service.predict_from_features.assert_called_once()
+
+def test_predict_endpoint_overloaded(mock_audio_file):
+    """
+    Test that shed requests surface as 503 with a Retry-After hint.
+    """
+    mock_service.predict.side_effect = ServiceOverloadedError("queue full")
+    files = {"file": ("test.wav", mock_audio_file, "audio/wav")}
+    response = client.post("/predict", files=files)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    mock_service.predict.side_effect = None
+
+def test_predict_endpoint_deadline_header(mock_audio_file):
+    """
+    Test that X-Deadline-Ms can only tighten the server deadline.
+    """
+    files = {"file": ("test.wav", mock_audio_file, "audio/wav")}
+    client.post("/predict", files=files, headers={"X-Deadline-Ms": "250"})
+    assert mock_service.predict.call_args.kwargs["deadline"] == 0.25
+
+    mock_audio_file.seek(0)
+    files = {"file": ("test.wav", mock_audio_file, "audio/wav")}
+    client.post("/predict", files=files, headers={"X-Deadline-Ms": "600000"})
+    assert mock_service.predict.call_args.kwargs["deadline"] == settings.PREDICT_DEADLINE_SECONDS
@@ -0,0 +1,110 @@
+import pytest
+import joblib
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+from compact_model import QuantizedForest, quantize_features
+from config import settings
+from services import ModelService
+from train import distill_model, save_artifacts, compare_models
+
+@pytest.fixture(scope="module")
+def teacher_data():
+    X, y = make_classification(
+        n_samples=600, n_features=58, n_informative=12, n_classes=4,
+        n_clusters_per_class=1, random_state=0
+    )
+    scaler = StandardScaler().fit(X[:450])
+    X_train, X_test = scaler.transform(X[:450]), scaler.transform(X[450:])
+    teacher = RandomForestClassifier(n_estimators=50, random_state=0).fit(X_train, y[:450])
+    return teacher, scaler, X_train, X_test, y[:450], y[450:]
+
+def test_quantize_features_is_int8_and_clipped():
+    X_q = quantize_features(np.array([[0.0, 0.5, -100.0, 100.0]]))
+    assert X_q.dtype == np.int8
+    assert X_q.tolist() == [[0, 8, -127, 127]]
+
+def test_quantized_forest_matches_source_forest(teacher_data):
+    _, _, X_train, X_test, y_train, _ = teacher_data
+    forest = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X_train, y_train)
+    compact = QuantizedForest.from_forest(forest)
+
+    proba = compact.predict_proba(X_test)
+    assert proba.shape == (len(X_test), 4)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0, rtol=1e-5)
+    assert np.mean(compact.predict(X_test) == forest.predict(X_test)) > 0.9
+
+    assert compact.threshold.dtype == np.int8
+    assert compact.value.dtype == np.uint8
+    assert compact.left.dtype == np.int16
+
+def test_quantized_forest_thresholds_below_input_range():
+    # One split at x <= -14.5: saturated inputs (-9 clips to -127) must go right
+    X = np.array([[-20.0], [-15.0], [-9.0], [0.0]])
+    forest = RandomForestClassifier(n_estimators=1, bootstrap=False, random_state=0).fit(X, [0, 0, 1, 1])
+    assert forest.estimators_[0].tree_.threshold[0] == -12.0
+
+    forest.estimators_[0].tree_.threshold[0] = -14.5
+    compact = QuantizedForest.from_forest(forest)
+
+    assert forest.predict([[-9.0]])[0] == 1
+    assert compact.predict(np.array([[-9.0]]))[0] == 1
+    assert compact.threshold[0] == -128
+
+@pytest.mark.parametrize("kind", ["trees", "logistic", "mlp"])
+def test_distill_model_tracks_teacher(teacher_data, kind):
+    teacher, _, X_train, X_test, _, _ = teacher_data
+    student = distill_model(teacher, X_train, kind=kind, n_trees=10, max_depth=6)
+
+    agreement = np.mean(student.predict(X_test) == teacher.predict(X_test))
+    assert agreement > 0.6
+    assert student.predict_proba(X_test[:1]).shape == (1, 4)
+
+def test_compact_artifact_report_and_loading(teacher_data, tmp_path, monkeypatch):
+    teacher, scaler, X_train, X_test, _, y_test = teacher_data
+    le = LabelEncoder().fit(["blues", "jazz", "metal", "rock"])
+    columns = [f"f{i}" for i in range(58)]
+    compact = distill_model(teacher, X_train, kind="trees", n_trees=10, max_depth=6)
+
+    save_artifacts(teacher, scaler, le, columns, str(tmp_path), "test", compact)
+    report = compare_models(str(tmp_path), "test", X_test, y_test)
+    assert report["compact"]["artifact_bytes"] < report["full"]["artifact_bytes"]
+    for row in report.values():
+        assert set(row) == {"accuracy", "artifact_bytes", "load_time_ms", "row_latency_ms"}
+
+    monkeypatch.setattr(settings, "MODELS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MODEL_VERSION", "test")
+    monkeypatch.setattr(settings, "MODEL_VARIANT", "compact")
+    service = ModelService()
+
+    assert service.is_ready()
+    assert isinstance(service.model, QuantizedForest)
+    result = service.predict_from_features({col: 0.0 for col in columns})
+    assert result["predicted_genre"] in le.classes_
+    assert sum(result["all_probabilities"].values()) == pytest.approx(1.0, rel=1e-5)
+
+def test_inference_maps_probabilities_through_model_classes(teacher_data, monkeypatch):
+    _, scaler, X_train, _, y_train, _ = teacher_data
+    # Student that never saw class 0 ("blues"): columns are classes 1..3
+    mask = y_train != 0
+    forest = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X_train[mask], y_train[mask])
+    compact = QuantizedForest.from_forest(forest)
+    assert compact.classes_.tolist() == [1, 2, 3]
+
+    monkeypatch.setattr(ModelService, "load_artifacts", lambda self: None)
+    service = ModelService()
+    service.model = compact
+    service.scaler = scaler
+    service.label_encoder = LabelEncoder().fit(["blues", "jazz", "metal", "rock"])
+    service.feature_columns = [f"f{i}" for i in range(58)]
+
+    features = dict(zip(service.feature_columns, scaler.inverse_transform(X_train[mask][:1])[0]))
+    result = service.predict_from_features(features)
+    proba = compact.predict_proba(X_train[mask][:1])[0]
+
+    assert result["all_probabilities"]["blues"] == 0.0
+    assert result["all_probabilities"]["jazz"] == pytest.approx(proba[0])
+    assert result["all_probabilities"]["rock"] == pytest.approx(proba[2])
+    assert result["confidence"] == max(result["all_probabilities"].values())
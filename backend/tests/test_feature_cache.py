@@ -0,0 +1,84 @@
+import os
+import pytest
+import numpy as np
+from feature_cache import FeatureCache
+
+def test_cache_evicts_least_recently_used():
+    array = np.zeros(256, dtype=np.float32)  # 1KB
+    cache = FeatureCache(max_bytes=2 * array.nbytes)
+
+    cache.put("a", array)
+    cache.put("b", array)
+    cache.get("a")
+    cache.put("c", array)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.stats()["memory_bytes"] == 2 * array.nbytes
+
+def test_cache_spills_to_memory_mapped_files(tmp_path):
+    array = np.arange(256, dtype=np.float32)
+    cache = FeatureCache(max_bytes=array.nbytes, spill_dir=str(tmp_path), max_spill_bytes=array.nbytes)
+
+    cache.put("a", array)
+    cache.put("b", array + 1)
+
+    spilled = cache.get("a")
+    assert isinstance(spilled, np.memmap)
+    np.testing.assert_array_equal(spilled, array)
+
+    # Spill directory is bounded too
+    cache.put("c", array + 2)
+    assert cache.get("a") is None
+    assert len(os.listdir(cache.spill_dir)) == 1
+
+def test_cache_respill_keeps_live_memory_maps_valid(tmp_path):
+    array = np.arange(256, dtype=np.float32)
+    cache = FeatureCache(max_bytes=array.nbytes // 2, spill_dir=str(tmp_path), max_spill_bytes=4 * array.nbytes)
+
+    cache.put("a", array)
+    view = cache.get("a")
+    cache.put("a", array + 1)
+
+    # The old map still reads the old file; new readers see the new one
+    np.testing.assert_array_equal(view, array)
+    np.testing.assert_array_equal(cache.get("a"), array + 1)
+    assert [name for name in os.listdir(cache.spill_dir) if name.endswith(".tmp")] == []
+    assert cache.stats()["spilled_bytes"] == array.nbytes
+
+def test_cache_spill_dir_is_per_process_and_pruned(tmp_path):
+    stale = tmp_path / "999999999"  # PID that cannot be running
+    stale.mkdir()
+    (stale / "leftover.npy").write_bytes(b"0" * 1024)
+    unrelated = tmp_path / "notes"
+    unrelated.mkdir()
+
+    cache = FeatureCache(max_bytes=1, spill_dir=str(tmp_path), max_spill_bytes=1024 * 1024)
+    cache.put("a", np.zeros(16, dtype=np.float32))
+
+    assert cache.spill_dir == str(tmp_path / str(os.getpid()))
+    assert not stale.exists()
+    assert unrelated.exists()
+    assert cache.stats()["spilled_entries"] == 1
+
+    cache.close()
+    assert not os.path.exists(cache.spill_dir)
+    assert cache.get("a") is None
+
+def test_cache_float16_storage():
+    cache = FeatureCache(max_bytes=1024 * 1024, dtype="float16")
+    matrix = np.linspace(-1, 1, 1000, dtype=np.float64).reshape(10, 100)
+
+    cache.put("mel", matrix)
+    cache.put("pcm", matrix, compact=False)
+    cache.put("tempo", np.float64(123.456789))
+
+    assert cache.get("mel").dtype == np.float32
+    np.testing.assert_allclose(cache.get("mel"), matrix, atol=1e-3)
+    assert cache.get("pcm").dtype == np.float64
+    assert cache.get("tempo") == 123.456789
+    assert cache.stats()["memory_bytes"] == matrix.size * 2 + matrix.nbytes + 8
+
+def test_cache_rejects_unknown_dtype():
+    with pytest.raises(ValueError):
+        FeatureCache(max_bytes=1024, dtype="int8")
@@ -1,6 +1,10 @@
 import pytest
 from feature_extractor import extract_features
+from feature_cache import FeatureCache
 import numpy as np
+import librosa
+import io
+import soundfile as sf
 
 def test_extract_features_valid_audio(mock_audio_file):
     """
@@ -28,3 +32,112 @@ def test_extract_features_structure(mock_audio_file):
     features = extract_features(mock_audio_file, duration=3)
     # 1 (length) + 8*2 (mean/var spectral) + 1 (tempo) + 20*2 (mfcc) = 1 + 16 + 1 + 40 = 58
     assert len(features) == 58 
+
+def test_extract_features_cache_matches_uncached(mock_audio_file):
+    """
+    Test that re-analysis from cached intermediates reproduces the same features.
+    """
+    expected = extract_features(mock_audio_file, duration=3)
+
+    cache = FeatureCache(max_bytes=64 * 1024 * 1024)
+    mock_audio_file.seek(0)
+    extract_features(mock_audio_file, duration=3, cache=cache)
+    mock_audio_file.seek(0)
+    cached = extract_features(mock_audio_file, duration=3, cache=cache)
+
+    for key, value in expected.items():
+        assert cached[key] == value, f"Feature {key} differs when cached"
+
+def test_extract_features_cache_shorter_duration_after_resampling(mock_audio_file_44k):
+    """
+    Test that a cached longer decode of a non-22050 Hz upload gives the same
+    features as a fresh decode at the shorter duration.
+    """
+    expected = extract_features(mock_audio_file_44k, duration=3)
+
+    cache = FeatureCache(max_bytes=64 * 1024 * 1024)
+    mock_audio_file_44k.seek(0)
+    extract_features(mock_audio_file_44k, duration=5, cache=cache)
+    mock_audio_file_44k.seek(0)
+    cached = extract_features(mock_audio_file_44k, duration=3, cache=cache)
+
+    for key, value in expected.items():
+        assert cached[key] == value, f"Feature {key} differs after cached 5s decode"
+
+def test_extract_features_float16_cache_tolerance(mock_audio_file_44k):
+    """
+    Test that float16 intermediates keep every feature within 0.5% (HPSS
+    signals, whose near-zero means are sensitive to rounding, stay float32).
+    """
+    expected = extract_features(mock_audio_file_44k, duration=3)
+
+    cache = FeatureCache(max_bytes=64 * 1024 * 1024, dtype="float16")
+    mock_audio_file_44k.seek(0)
+    extract_features(mock_audio_file_44k, duration=3, cache=cache)
+    mock_audio_file_44k.seek(0)
+    cached = extract_features(mock_audio_file_44k, duration=3, cache=cache)
+
+    for key, value in expected.items():
+        assert cached[key] == pytest.approx(value, rel=5e-3, abs=1e-9), f"Feature {key} drifts with float16"
+
+def test_extract_features_cache_recomputes_only_downstream(mock_audio_file, monkeypatch):
+    """
+    Test that changing analysis parameters reuses upstream stages.
+    """
+    calls = {"load": 0, "stft": 0}
+    original_load, original_stft = librosa.load, librosa.stft
+
+    def counting_load(*args, **kwargs):
+        calls["load"] += 1
+        return original_load(*args, **kwargs)
+
+    def counting_stft(*args, **kwargs):
+        calls["stft"] += 1
+        return original_stft(*args, **kwargs)
+
+    monkeypatch.setattr(librosa, "load", counting_load)
+    monkeypatch.setattr(librosa, "stft", counting_stft)
+
+    cache = FeatureCache(max_bytes=64 * 1024 * 1024)
+    extract_features(mock_audio_file, duration=3, cache=cache)
+    assert calls == {"load": 1, "stft": 1}
+
+    # Profile change: decode and STFT are reused
+    extract_features(mock_audio_file, duration=3, profile="fast", cache=cache)
+    assert calls == {"load": 1, "stft": 1}
+
+    # Shorter duration: decode is reused, STFT onwards recomputed
+    features = extract_features(mock_audio_file, duration=2, cache=cache)
+    assert calls == {"load": 1, "stft": 2}
+    assert features["length"] == 22050 * 2
+
+def _beat_clip(seed, sr=22050, duration=3):
+    """
+    Synthetic click track with a competing off-beat layer and noise.
+    """
+    rng = np.random.default_rng(seed)
+    bpm = rng.uniform(60, 180)
+    length = duration * sr
+    y = librosa.clicks(times=np.arange(0, duration, 60 / bpm), sr=sr, length=length,
+                       click_freq=rng.uniform(500, 3000))
+    y += 0.5 * librosa.clicks(times=np.arange(30 / bpm * rng.uniform(0.3, 1), duration, 60 / bpm * rng.choice([0.5, 1.5, 2 / 3])),
+                              sr=sr, length=length, click_freq=rng.uniform(100, 800))
+    y += 0.05 * rng.standard_normal(length)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, y.astype(np.float32), sr, format='WAV', subtype='FLOAT')
+    buffer.seek(0)
+    return buffer
+
+@pytest.mark.parametrize("seed", [3, 5, 8])
+def test_extract_features_tempo_matches_beat_track(seed):
+    """
+    Test that the full-profile tempo equals the training-time beat_track(y=y) tempo.
+    """
+    buffer = _beat_clip(seed)
+    y, sr = librosa.load(buffer, duration=3, sr=22050)
+    expected, _ = librosa.beat.beat_track(y=y, sr=sr)
+
+    buffer.seek(0)
+    features = extract_features(buffer, duration=3)
+    assert features["tempo"] == np.asarray(expected).reshape(-1)[0]
@@ -0,0 +1,160 @@
+import pytest
+import io
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+import services
+from config import settings
+from main import app
+from services import ModelService, ServiceOverloadedError, get_model_service
+
+# Simulated per-profile extraction cost (seconds), serialised on one "CPU"
+FULL_COST = 0.2
+FAST_COST = 0.02
+
+class StubModelService(ModelService):
+    """
+    ModelService with small in-memory artifacts instead of the trained pickles.
+    """
+    def __init__(self, feature_columns):
+        self._stub_columns = feature_columns
+        super().__init__()
+
+    def load_artifacts(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(20, len(self._stub_columns)))
+        y = np.array([0, 1] * 10)
+        self.feature_columns = self._stub_columns
+        self.scaler = StandardScaler().fit(X)
+        self.model = LogisticRegression().fit(self.scaler.transform(X), y)
+        self.label_encoder = LabelEncoder().fit(["jazz", "rock"])
+
+@pytest.fixture
+def stub_service(mock_feature_columns, monkeypatch):
+    cpu = threading.Lock()
+    calls = []
+
+    def fake_extract_features(audio_input, duration=3, profile="full", **kwargs):
+        calls.append(profile)
+        with cpu:
+            time.sleep(FULL_COST if profile == "full" else FAST_COST)
+        return {col: 0.0 for col in mock_feature_columns}
+
+    monkeypatch.setattr(services, "extract_features", fake_extract_features)
+    monkeypatch.setattr(settings, "DEGRADE_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(settings, "MAX_QUEUE_DEPTH", 8)
+    monkeypatch.setattr(settings, "PREDICT_DEADLINE_SECONDS", 1.0)
+
+    service = StubModelService(mock_feature_columns)
+    service.extract_calls = calls
+    # The stub has no JIT warm-up; record latencies from the first request
+    service._cold_profiles.clear()
+    return service
+
+def test_predict_reports_full_then_cache_tier(stub_service):
+    first = stub_service.predict(io.BytesIO(b"clip"), "a.wav")
+    second = stub_service.predict(io.BytesIO(b"clip"), "a.wav")
+
+    assert first["tier"] == "full"
+    assert second["tier"] == "cache"
+    assert second["predicted_genre"] == first["predicted_genre"]
+    assert stub_service.extract_calls == ["full"]
+
+def test_first_sample_per_profile_is_ignored(mock_feature_columns):
+    service = StubModelService(mock_feature_columns)
+
+    # Cold-start sample far above the deadline (JIT warm-up) is discarded
+    service._record_latency("full", 5.0)
+    assert service._select_profile(depth=0, budget=1.0) == "full"
+
+    service._record_latency("full", 0.2)
+    assert service._latency_ewma["full"] == 0.2
+
+    service._record_latency("fast", 5.0)
+    # Would shed (depth > 0, estimate > budget) if the cold sample counted
+    assert service._select_profile(depth=settings.DEGRADE_QUEUE_DEPTH, budget=1.0) == "fast"
+
+def test_predict_degrades_when_full_misses_deadline(stub_service):
+    stub_service.predict(io.BytesIO(b"warmup"), "a.wav")
+    result = stub_service.predict(io.BytesIO(b"other"), "b.wav", deadline=FULL_COST / 2)
+
+    assert result["tier"] == "fast"
+
+def test_predict_sheds_when_fast_misses_deadline(stub_service):
+    stub_service.predict(io.BytesIO(b"warmup"), "a.wav")
+    stub_service.predict(io.BytesIO(b"degraded"), "b.wav", deadline=FULL_COST / 2)
+    stub_service._in_flight = 1  # Another request is busy
+    with pytest.raises(ServiceOverloadedError):
+        stub_service.predict(io.BytesIO(b"other"), "c.wav", deadline=FAST_COST / 10)
+
+def test_predict_recovers_when_queue_idle(stub_service):
+    # A past burst left a fast-path estimate far above the deadline
+    stub_service._record_latency("fast", 3.0)
+    stub_service._record_latency("full", 3.0)
+
+    results = [stub_service.predict(io.BytesIO(bytes([i])), "a.wav") for i in range(5)]
+
+    assert [r["tier"] for r in results] == ["fast"] * 5
+    assert stub_service.extract_calls == ["fast"] * 5
+    assert stub_service._latency_ewma["fast"] < 1.0
+
+def test_predict_returns_to_full_tier_when_estimate_expires(stub_service, monkeypatch):
+    stub_service._record_latency("full", 3.0)
+    assert stub_service.predict(io.BytesIO(b"a"), "a.wav")["tier"] == "fast"
+
+    monkeypatch.setattr(services, "LATENCY_ESTIMATE_TTL", 0.0)
+    assert stub_service.predict(io.BytesIO(b"b"), "b.wav")["tier"] == "full"
+
+def test_predict_enforces_deadline_after_analysis(stub_service):
+    # No estimate yet, so the full profile is admitted but overruns
+    with pytest.raises(ServiceOverloadedError):
+        stub_service.predict(io.BytesIO(b"slow"), "a.wav", deadline=FULL_COST / 2)
+
+    # The completed full result is cached, so the retry is served in time
+    retry = stub_service.predict(io.BytesIO(b"slow"), "a.wav", deadline=FULL_COST / 2)
+    assert retry["tier"] == "cache"
+    assert stub_service.extract_calls == ["full"]
+
+def test_predict_rejects_when_queue_full(stub_service, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_QUEUE_DEPTH", 0)
+    with pytest.raises(ServiceOverloadedError):
+        stub_service.predict(io.BytesIO(b"clip"), "a.wav")
+
+def test_overload_keeps_p99_bounded(stub_service, mock_audio_file):
+    """
+    Fires many concurrent uploads at the app; without admission control the
+    serialised full pipeline would take len(requests) * FULL_COST for the tail.
+    """
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_model_service] = lambda: stub_service
+    client = TestClient(app)
+    audio = mock_audio_file.getvalue()
+    n_requests = 40
+
+    def send(i):
+        start = time.monotonic()
+        # Distinct payloads so the cache tier does not mask the load
+        files = {"file": ("test.wav", audio + bytes([i]), "audio/wav")}
+        response = client.post("/predict", files=files)
+        return response, time.monotonic() - start
+
+    try:
+        with ThreadPoolExecutor(max_workers=n_requests) as pool:
+            outcomes = list(pool.map(send, range(n_requests)))
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous_overrides)
+
+    statuses = [response.status_code for response, _ in outcomes]
+    tiers = {response.json()["tier"] for response, _ in outcomes if response.status_code == 200}
+    latencies = sorted(elapsed for _, elapsed in outcomes)
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+
+    assert set(statuses) <= {200, 503}
+    assert "fast" in tiers
+    assert p99 < n_requests * FULL_COST / 2
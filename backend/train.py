@@ -3,11 +3,15 @@ import joblib
 import pandas as pd
 import numpy as np
 import argparse
+import time
 from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from feature_extractor import extract_features
+from compact_model import QuantizedForest
 import warnings
 
 # Suppress warnings for cleaner output
@@ -16,6 +20,7 @@ warnings.filterwarnings('ignore')
 # Configuration
 GENRES = ['blues', 'classical', 'country', 'disco', 'hiphop', 'jazz', 'metal', 'pop', 'reggae', 'rock']
 RANDOM_SEED = 42
+DISTILL_KINDS = ['trees', 'logistic', 'mlp']
 
 def prepare_dataset(data_path):
     """
@@ -102,9 +107,75 @@ def train_model(df):
     acc = accuracy_score(y_test, y_pred)
     print(f"\nTest Set Accuracy: {acc:.4f}")
     
-    return best_model, scaler, le, feature_columns, acc
+    splits = (X_train_scaled, X_test_scaled, y_train, y_test)
+    return best_model, scaler, le, feature_columns, acc, splits
 
-def save_artifacts(model, scaler, le, feature_columns, output_dir, version):
+def distill_model(teacher, X_train_scaled, kind='trees', n_trees=20, max_depth=8, augment=4, noise=0.1):
+    """
+    Distils the forest into a compact student trained on the teacher's labels.
+    The training rows are augmented with jittered copies (in scaled space) so
+    the student sees the teacher's decision boundaries, not just the data.
+    """
+    print(f"\nDistilling into compact '{kind}' model...")
+    rng = np.random.default_rng(RANDOM_SEED)
+    X_aug = np.vstack([X_train_scaled] + [
+        X_train_scaled + rng.normal(scale=noise, size=X_train_scaled.shape) for _ in range(augment)
+    ])
+    y_aug = teacher.predict(X_aug)
+
+    if kind == 'trees':
+        student = RandomForestClassifier(
+            n_estimators=n_trees, max_depth=max_depth, random_state=RANDOM_SEED, n_jobs=-1
+        )
+        student.fit(X_aug, y_aug)
+        return QuantizedForest.from_forest(student)
+    if kind == 'logistic':
+        return LogisticRegression(max_iter=1000).fit(X_aug, y_aug)
+    if kind == 'mlp':
+        return MLPClassifier(
+            hidden_layer_sizes=(64,), max_iter=500, early_stopping=True, random_state=RANDOM_SEED
+        ).fit(X_aug, y_aug)
+    raise ValueError(f"Unknown distillation kind: {kind}")
+
+def _benchmark_artifact(path, X_test_scaled, y_test, n_rows=200):
+    start = time.perf_counter()
+    model = joblib.load(path)
+    load_time = time.perf_counter() - start
+
+    rows = X_test_scaled[:n_rows]
+    start = time.perf_counter()
+    for i in range(len(rows)):
+        model.predict_proba(rows[i:i + 1])
+    row_latency = (time.perf_counter() - start) / max(len(rows), 1)
+
+    return {
+        "accuracy": float(accuracy_score(y_test, model.predict(X_test_scaled))),
+        "artifact_bytes": os.path.getsize(path),
+        "load_time_ms": load_time * 1000,
+        "row_latency_ms": row_latency * 1000,
+    }
+
+def compare_models(output_dir, version, X_test_scaled, y_test):
+    """
+    Compares the saved full forest and compact artifacts on accuracy, artifact
+    size, load time and single-row predict_proba latency.
+    """
+    suffix = f"_{version}" if version else ""
+    report = {
+        "full": _benchmark_artifact(os.path.join(output_dir, f"best_model{suffix}.pkl"), X_test_scaled, y_test),
+        "compact": _benchmark_artifact(os.path.join(output_dir, f"compact_model{suffix}.pkl"), X_test_scaled, y_test),
+    }
+
+    print("\nDistillation report:")
+    print(f"{'':10}{'accuracy':>10}{'size (KB)':>12}{'load (ms)':>12}{'row (ms)':>10}")
+    for name, row in report.items():
+        print(
+            f"{name:10}{row['accuracy']:>10.4f}{row['artifact_bytes'] / 1024:>12.1f}"
+            f"{row['load_time_ms']:>12.2f}{row['row_latency_ms']:>10.3f}"
+        )
+    return report
+
+def save_artifacts(model, scaler, le, feature_columns, output_dir, version, compact_model=None):
     """
     Saves artifacts with version suffix.
     """
@@ -118,10 +189,13 @@ def save_artifacts(model, scaler, le, feature_columns, output_dir, version):
     joblib.dump(scaler, os.path.join(output_dir, f"scaler{suffix}.pkl"))
     joblib.dump(le, os.path.join(output_dir, f"label_encoder{suffix}.pkl"))
     joblib.dump(feature_columns, os.path.join(output_dir, f"feature_columns{suffix}.pkl"))
+    if compact_model is not None:
+        joblib.dump(compact_model, os.path.join(output_dir, f"compact_model{suffix}.pkl"))
     
     metadata = {
         "accuracy": float(model.score(scaler.transform(np.zeros((1, len(feature_columns)))), [0])) if False else "N/A", # Placeholder
         "model_type": "RandomForestClassifier",
+        "compact_model_type": type(compact_model).__name__ if compact_model is not None else None,
         "version": version
     }
     joblib.dump(metadata, os.path.join(output_dir, f"results{suffix}.pkl"))
@@ -133,12 +207,33 @@ if __name__ == "__main__":
     parser.add_argument("--dataset", type=str, required=True, help="Path to GTZAN dataset")
     parser.add_argument("--output", type=str, default="models", help="Output directory")
     parser.add_argument("--version", type=str, default="v1", help="Model version tag (e.g., v1, v2)")
+    parser.add_argument("--distill", type=str, choices=DISTILL_KINDS, default=None,
+                        help="Also save a compact distilled model (quantized trees, logistic or MLP)")
+    parser.add_argument("--distill-trees", type=int, default=20, help="Number of trees for --distill trees")
+    parser.add_argument("--distill-depth", type=int, default=8, help="Max tree depth for --distill trees")
     
     args = parser.parse_args()
     
     try:
         df = prepare_dataset(args.dataset)
-        model, scaler, le, feature_columns, acc = train_model(df)
-        save_artifacts(model, scaler, le, feature_columns, args.output, args.version)
+        model, scaler, le, feature_columns, acc, splits = train_model(df)
+        X_train_scaled, X_test_scaled, y_train, y_test = splits
+
+        compact_model = None
+        if args.distill:
+            compact_model = distill_model(
+                model, X_train_scaled, kind=args.distill,
+                n_trees=args.distill_trees, max_depth=args.distill_depth
+            )
+
+        save_artifacts(model, scaler, le, feature_columns, args.output, args.version, compact_model)
+
+        if compact_model is not None:
+            report = compare_models(args.output, args.version, X_test_scaled, y_test)
+            suffix = f"_{args.version}" if args.version else ""
+            results_path = os.path.join(args.output, f"results{suffix}.pkl")
+            metadata = joblib.load(results_path)
+            metadata["distillation"] = report
+            joblib.dump(metadata, results_path)
     except Exception as e:
         print(f"\nTraining failed: {e}")
\ No newline at end of file